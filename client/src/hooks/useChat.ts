@@ -36,18 +36,45 @@ export const useChat = (sessionId: string) => {
     setIsLoading(true);
 
     try {
-      const response = await apiClient.post('/chat', {
-        session_id: sessionId,
-        message: input,
-        use_rag: isRagEnabled, // <-- Pass the flag to the backend
-        system_prompt: systemPrompt, // <-- Pass the system prompt to the backend
+      // The backend streams the answer as Server-Sent Events: `data: {"token": "..."}`
+      const response = await fetch(`${apiClient.defaults.baseURL}/chat`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          session_id: sessionId,
+          message: input,
+          use_rag: isRagEnabled, // <-- Pass the flag to the backend
+          system_prompt: systemPrompt, // <-- Pass the system prompt to the backend
+        }),
       });
-      const botMessage: Message = {
-        id: uuidv4(),
-        role: 'assistant',
-        content: response.data.response,
-      };
-      setMessages((prev) => [...prev, botMessage]);
+      if (!response.ok || !response.body) {
+        throw new Error(`Chat request failed with status ${response.status}`);
+      }
+
+      const botMessageId = uuidv4();
+      setMessages((prev) => [...prev, { id: botMessageId, role: 'assistant', content: '' }]);
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = '';
+      while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // Events are separated by a blank line; keep any incomplete event in the buffer
+        const events = buffer.split('\n\n');
+        buffer = events.pop() ?? '';
+        for (const event of events) {
+          if (!event.startsWith('data: ')) continue;
+          const data = JSON.parse(event.slice('data: '.length));
+          const text = data.token ?? data.error ?? '';
+          if (!text) continue;
+          setMessages((prev) =>
+            prev.map((msg) => (msg.id === botMessageId ? { ...msg, content: msg.content + text } : msg))
+          );
+        }
+      }
     } catch (error) {
       const errorMessage: Message = {
         id: uuidv4(),
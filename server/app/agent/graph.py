@@ -4,6 +4,7 @@ from app.agent.nodes import (
     agent_entry, # <-- Import the new dummy entry node
     check_for_rag,
     retrieve_from_rag,
+    retrieve_and_search,
     generate_with_context,
     generate_direct,
 )
@@ -17,6 +18,7 @@ def create_agent_graph():
     # 1. Add all the REAL nodes to the graph
     graph.add_node("agent_entry", agent_entry) # <-- Add our entry node
     graph.add_node("retrieve_from_rag", retrieve_from_rag)
+    graph.add_node("retrieve_and_search", retrieve_and_search)
     graph.add_node("generate_with_context", generate_with_context)
     graph.add_node("generate_direct", generate_direct)
 
@@ -33,12 +35,14 @@ def create_agent_graph():
         # The `path_map` connects the function's output to the next node
         path_map={
             "rag_retrieval": "retrieve_from_rag",
+            "retrieve_and_search": "retrieve_and_search",
             "generate_direct": "generate_direct"
         }
     )
 
     # 4. Define the edges for the RAG path
     graph.add_edge("retrieve_from_rag", "generate_with_context")
+    graph.add_edge("retrieve_and_search", "generate_with_context")
 
     # 5. Define the finish points for both paths
     graph.add_edge("generate_with_context", END)
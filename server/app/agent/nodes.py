@@ -2,48 +2,78 @@
 from langchain_google_genai import ChatGoogleGenerativeAI
 # from langchain_openai import ChatOpenAI
 from langchain_groq import ChatGroq
-from app.services import vector_store
+from app.services import embed_batcher, llm_cache, vector_store
 from app.tools import web_search
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from app.core.config import settings
 
 from app.agent.state import AgentState
-import os 
-from dotenv import load_dotenv
+import asyncio
+import functools
+import re
 
 
-load_dotenv()
-
-# Only set environment variables if they exist
-google_api_key = os.getenv("GOOGLE_API_KEY")
-if google_api_key:
-    os.environ["GOOGLE_API_KEY"] = google_api_key
-
 # Model configuration
-gemini_model = os.getenv("GEMINI_MODEL", "gemini-1.5-pro")  # Default fallback
+gemini_model = settings.GEMINI_MODEL
+WARMUP_TIMEOUT_SECONDS = 10  # Startup never waits longer than this for the warmup call
+
 
 # Text chat models (with temperature settings)
-llm_gemini = ChatGoogleGenerativeAI(model=gemini_model, temperature=0)
+# They are built on first use rather than at import, so importing the agent stays cheap.
+@functools.cache
+def get_llm_gemini() -> ChatGoogleGenerativeAI:
+    return ChatGoogleGenerativeAI(
+        model=gemini_model, temperature=0, google_api_key=settings.GOOGLE_API_KEY
+    )
 # llm_groq = ChatGroq(model=os.getenv("GROQ_MODEL"), temperature=0)
 
-llm_gemini_rag = ChatGoogleGenerativeAI(
-    model=gemini_model,
-    temperature=0.7,
-    convert_system_message_to_human=True  # Important for Gemini
-)
+
+@functools.cache
+def get_llm_gemini_rag() -> ChatGoogleGenerativeAI:
+    return ChatGoogleGenerativeAI(
+        model=gemini_model,
+        temperature=0.7,
+        convert_system_message_to_human=True,  # Important for Gemini
+        google_api_key=settings.GOOGLE_API_KEY,
+    )
+
+
+async def warmup_llm():
+    """
+    Sends a trivial request through llm_gemini so its async client, DNS lookup
+    and TLS connection are set up before the first real /chat request.
+    The call is bounded by WARMUP_TIMEOUT_SECONDS, since its retries would
+    otherwise hold up startup when Gemini is slow or the key is invalid.
+    """
+    try:
+        llm_gemini = get_llm_gemini()
+        await asyncio.wait_for(
+            llm_gemini.ainvoke([HumanMessage(content="ping")]), timeout=WARMUP_TIMEOUT_SECONDS
+        )
+        print("Gemini client warmed up.")
+    except asyncio.TimeoutError:
+        print(f"Gemini warmup timed out after {WARMUP_TIMEOUT_SECONDS}s, the first request will pay the cold start.")
+    except Exception as e:
+        print(f"Gemini warmup failed, the first request will pay the cold start: {e}")
+
+
+# Routing keywords, compiled once so each message is scanned in a single pass
+_CREATIVE_RE = re.compile(r"\b(creative|write)\b", re.IGNORECASE)
+_CODE_RE = re.compile(r"\b(code|python)\b", re.IGNORECASE)
 
 
 def route_to_llm(state: AgentState) -> str:
     """According to the prompt decide which LLm to use"""
     lastmessage = state["messages"][-1].content
     
-    if "creative" in lastmessage.lower() or "write" in lastmessage.lower():
+    if _CREATIVE_RE.search(lastmessage):
         return "gemini"
     
-    if "code" in lastmessage.lower() or "python" in lastmessage.lower():
+    if _CODE_RE.search(lastmessage):
         return "groq"
     
-    return "ginini"
+    return "gemini"
 
 
 
@@ -62,7 +92,7 @@ def generate_gemini(state: AgentState):
     # Ensure proper format: list of message objects
     messages = [HumanMessage(content=last_msg)]
     
-    response = llm_gemini.invoke(messages)
+    response = get_llm_gemini().invoke(messages)
     return {"messages": [response]}
 
 # def generate_groq(state: AgentState):
@@ -97,6 +127,9 @@ def generate_gemini(state: AgentState):
 #     print("---ROUTING: Direct to LLM---")
 #     return "__end__" # LangGraph convention for routing to another router
 
+# Keywords implying the user also wants fresh information from the web
+SEARCH_KEYWORDS = ["latest", "what is the current", "search for", "tavily"]
+
 def check_for_rag(state: AgentState):
     """
     Checks the 'use_rag' flag passed from the frontend.
@@ -105,6 +138,10 @@ def check_for_rag(state: AgentState):
     """
     print(f"--- ROUTER: Checking for RAG. Flag is: {state.get('use_rag')} ---")
     if state.get("use_rag", False):
+        last_message = state["messages"][-1].content.lower()
+        if any(keyword in last_message for keyword in SEARCH_KEYWORDS):
+            # Documents and the web are both needed, fetch them in parallel
+            return "retrieve_and_search"
         # The string "rag_retrieval" will be used for routing.
         # The node itself returns an empty dictionary, as it doesn't modify state.
         return "rag_retrieval"
@@ -114,7 +151,16 @@ def check_for_rag(state: AgentState):
     
     
     
-def retrieve_from_rag(state: AgentState):
+async def _retrieve_context(user_query: str, session_id: str) -> str:
+    """
+    Embeds the query through the shared batcher, so concurrent requests are
+    embedded together, then searches the session's chunks with that vector.
+    """
+    query_embedding = await embed_batcher.embed(user_query)
+    chunks = await asyncio.to_thread(vector_store.search_by_vector, query_embedding, session_id)
+    return "\n\n".join(chunks)
+
+async def retrieve_from_rag(state: AgentState):
     """
     Retrieves relevant documents from the ChromaDB vector store,
     filtered by the session_id from the agent's state.
@@ -128,11 +174,7 @@ def retrieve_from_rag(state: AgentState):
         print("Warning: No session_id found in state for RAG retrieval.")
         return {"context": "Error: No session ID provided for document retrieval."}
     
-    retriever = vector_store.get_retriever(session_id=session_id)
-    
-    retrieved_docs = retriever.invoke(user_query)
-    
-    context = "\n\n".join([doc.page_content for doc in retrieved_docs])
+    context = await _retrieve_context(user_query, session_id)
     
     print(f"Retrieved context for session {session_id}: {context[:300]}...")
     
@@ -145,60 +187,163 @@ def retrieve_from_rag(state: AgentState):
 #     response = llm_gemini.invoke(state["messages"])
 #     return {"messages": [response]}
 
-def run_web_search(state: AgentState):
+async def run_web_search(state: AgentState):
     """Node to perform web search."""
-    search_tool = web_search.get_web_search_tool()
+    search_tool = web_search.get_async_web_search_tool()
     
     if not search_tool:
         return {"context": "Web search is not available. Please provide a TAVILY_API_KEY in your environment variables."}
     
     try:
-        search_results = search_tool.invoke({"query": state["messages"][-1].content})
-        return {"context": search_results}
+        search_results = await search_tool(state["messages"][-1].content)
+        return {"context": _format_search_results(search_results)}
     except Exception as e:
         return {"context": f"Web search failed: {str(e)}"}
 
-def generate_with_context(state: AgentState):
+def _format_search_results(search_results) -> str:
+    """Flattens Tavily results (a list of {url, content} dicts) into plain text."""
+    if isinstance(search_results, list):
+        return "\n\n".join(
+            "\n".join(filter(None, [result.get("url"), result.get("content")])) if isinstance(result, dict) else str(result)
+            for result in search_results
+        )
+    return str(search_results)
+
+async def retrieve_and_search(state: AgentState):
     """
-    Generates a response using the LLM with the retrieved context.
-    This is the final step in the RAG path.
+    Runs RAG retrieval and web search concurrently, so the latency is
+    max(T_rag, T_web) instead of the sum. The two results are kept in
+    separate state keys so the prompt can label each source.
     """
-    print("--- NODE: Generating response with context ---")
+    print("--- NODE: Retrieving from RAG and searching the web in parallel ---")
     user_query = state["messages"][-1].content
-    context = state.get("context", "")
+    session_id = state.get("session_id")
+    search_tool = web_search.get_async_web_search_tool()
 
-    # Use the user-provided system prompt with RAG context
-    user_system_prompt = state.get("system_prompt", "You are a helpful AI assistant.")
-    
-    prompt = f"""{user_system_prompt}
+    async def retrieve():
+        if not session_id:
+            return "Error: No session ID provided for document retrieval."
+        return await _retrieve_context(user_query, session_id)
 
-    Use the following document snippets as your primary source of knowledge to answer the user's question. The snippets are from a document the user just uploaded.
+    async def search():
+        if not search_tool:
+            return "Web search is not available. Please provide a TAVILY_API_KEY in your environment variables."
+        search_results = await search_tool(user_query)
+        return _format_search_results(search_results)
 
-    If the user's question is general, like "what is this document about?" or "summarize this file", provide a concise summary of the provided context.
+    rag_context, web_context = await asyncio.gather(retrieve(), search(), return_exceptions=True)
+    if isinstance(rag_context, Exception):
+        rag_context = f"Document retrieval failed: {str(rag_context)}"
+    if isinstance(web_context, Exception):
+        web_context = f"Web search failed: {str(web_context)}"
 
-    If the user asks a specific question, answer it directly using only the information in the snippets.
+    print(f"Retrieved context for session {session_id}: {rag_context[:300]}...")
+    print(f"Retrieved web results: {web_context[:300]}...")
 
-    If the snippets do not contain the answer to a specific question, state that the provided document doesn't seem to contain that information.
+    return {"context": rag_context, "web_context": web_context}
 
-    DOCUMENT SNIPPETS:
-    ---
-    {context}
-    ---
+_RAG_INSTRUCTIONS = """Use the following document snippets as your primary source of knowledge to answer the user's question. The snippets are from a document the user just uploaded.
+
+If the user's question is general, like "what is this document about?" or "summarize this file", provide a concise summary of the provided context.
+
+If the user asks a specific question, answer it directly using only the information in the snippets.
+
+If the snippets do not contain the answer to a specific question, state that the provided document doesn't seem to contain that information."""
+
+# Used when the question also needed a web search (see retrieve_and_search)
+_RAG_WEB_INSTRUCTIONS = """Use the following document snippets and web search results to answer the user's question. The snippets are from a document the user just uploaded; the web search results were found for this question.
+
+Use the snippets for anything about the uploaded document, and the web search results for current or general information the document does not cover.
+
+If the user asks a specific question, answer it directly using only the information in these two sources.
+
+If neither the snippets nor the web search results contain the answer, say that you could not find that information."""
+
+_DOCUMENT_SECTION = """
+DOCUMENT SNIPPETS:
+---
+{context}
+---
+"""
+
+_WEB_SECTION = """
+WEB SEARCH RESULTS:
+---
+{web_context}
+---
+"""
+
+_QUESTION_SECTION = """
+USER'S QUESTION:
+"{question}"
+"""
+
+_RAG_TEMPLATE = ChatPromptTemplate.from_messages([
+    ("system", "{system_prompt}"),
+    MessagesPlaceholder("history"),
+    ("human", _RAG_INSTRUCTIONS + "\n" + _DOCUMENT_SECTION + _QUESTION_SECTION),
+])
+
+_RAG_WEB_TEMPLATE = ChatPromptTemplate.from_messages([
+    ("system", "{system_prompt}"),
+    MessagesPlaceholder("history"),
+    ("human", _RAG_WEB_INSTRUCTIONS + "\n" + _DOCUMENT_SECTION + _WEB_SECTION + _QUESTION_SECTION),
+])
 
-    USER'S QUESTION:
-    "{user_query}"
-    """
-    # --------------------------
 
-    # We replace the user's last message with this new, enriched prompt
-    messages_for_llm = state["messages"][:-1] + [
-        ( "user", prompt)
-    ]
+@functools.lru_cache(maxsize=64)
+def _rag_prompt_for(system_prompt: str, with_web: bool = False) -> ChatPromptTemplate:
+    """Returns the RAG template (with or without web results) with the system prompt already filled in."""
+    template = _RAG_WEB_TEMPLATE if with_web else _RAG_TEMPLATE
+    return template.partial(system_prompt=system_prompt)
 
-    response = llm_gemini.invoke(messages_for_llm)
+async def generate_with_context(state: AgentState):
+    """
+    Generates a response using the LLM with the retrieved context.
+    This is the final step in the RAG path.
+    """
+    print("--- NODE: Generating response with context ---")
+    user_query = state["messages"][-1].content
+    context = state.get("context", "")
+    web_context = state.get("web_context", "")
+
+    # Use the user-provided system prompt with RAG context
+    user_system_prompt = state.get("system_prompt", "You are a helpful AI assistant.")
+    
+    # The template is parsed once; only the per-request values are filled in here.
+    # History is kept, and the user's last message is replaced by the enriched prompt.
+    # Web results, when present, get their own section instead of posing as document snippets.
+    if web_context:
+        messages_for_llm = _rag_prompt_for(user_system_prompt, with_web=True).format_messages(
+            history=state["messages"][:-1],
+            context=context,
+            web_context=web_context,
+            question=user_query,
+        )
+    else:
+        messages_for_llm = _rag_prompt_for(user_system_prompt).format_messages(
+            history=state["messages"][:-1],
+            context=context,
+            question=user_query,
+        )
+
+    cache_key = llm_cache.make_key(
+        model=gemini_model,
+        messages=messages_for_llm,
+        temperature=get_llm_gemini().temperature,
+        system_prompt=user_system_prompt,
+        context=f"{context}\n\n{web_context}" if web_context else context,
+    )
+    cached = await llm_cache.get(cache_key)
+    if cached is not None:
+        print("--- LLM CACHE HIT ---")
+        return {"messages": [AIMessage(content=cached)]}
+
+    response = await get_llm_gemini().ainvoke(messages_for_llm)
+    await llm_cache.set(cache_key, response.content)
     return {"messages": [response]}
 
-def generate_direct(state: AgentState):
+async def generate_direct(state: AgentState):
     """
     Generates a response using the LLM directly, without any RAG context.
     This is the standard chat path.
@@ -208,13 +353,22 @@ def generate_direct(state: AgentState):
     # Get the user-provided system prompt
     user_system_prompt = state.get("system_prompt", "You are a helpful AI assistant.")
     
-    # Create messages with system prompt
-    messages_for_llm = [("system", user_system_prompt)] + [
-        (msg.type if hasattr(msg, 'type') else "user", msg.content) 
-        for msg in state["messages"]
-    ]
-    
-    response = llm_gemini.invoke(messages_for_llm)
+    # Create messages with system prompt; the state already holds message objects
+    messages_for_llm = [SystemMessage(content=user_system_prompt), *state["messages"]]
+
+    cache_key = llm_cache.make_key(
+        model=gemini_model,
+        messages=messages_for_llm,
+        temperature=get_llm_gemini().temperature,
+        system_prompt=user_system_prompt,
+    )
+    cached = await llm_cache.get(cache_key)
+    if cached is not None:
+        print("--- LLM CACHE HIT ---")
+        return {"messages": [AIMessage(content=cached)]}
+
+    response = await get_llm_gemini().ainvoke(messages_for_llm)
+    await llm_cache.set(cache_key, response.content)
     return {"messages": [response]}
 
 
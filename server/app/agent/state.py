@@ -5,6 +5,7 @@ from langchain_core.messages import BaseMessage
 class AgentState(TypedDict):
     messages: List[BaseMessage]
     context: str # To hold retrive context
+    web_context: str # Web search results, kept apart from the document context
     use_rag: bool # Flag to decide if we should use rag or not
     session_id: str
     system_prompt: str # User-provided system prompt for agent behavior
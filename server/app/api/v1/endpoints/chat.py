@@ -1,7 +1,14 @@
+import asyncio
+import hashlib
+import weakref
+from typing import Dict, Optional
+import orjson
 from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from langchain_core.messages import HumanMessage
 from app.agent.graph import create_agent_graph
+from app.services import semantic_cache
 
 
 agent_executer = create_agent_graph()
@@ -28,8 +35,140 @@ class ChatRequest(BaseModel):
     
 #     return {"response": response["messages"][-1].content}
 
+# Only tokens produced by these nodes are part of the answer sent to the user
+GENERATION_NODES = {"generate_direct", "generate_with_context"}
+
+ERROR_RESPONSE = "Sorry, an error occurred while processing your request."
+
+# Messages answered directly, without running the agent
+GREETINGS_SET = frozenset({"hi", "hello", "hey", "yo", "sup"})
+GREETING_RESPONSE = "Hello! How can I help you today?"
+EMPTY_MESSAGE_RESPONSE = "Please enter a question."
+MAX_MESSAGE_LENGTH = 8000
+TOO_LONG_RESPONSE = f"Your message is too long. Please keep it under {MAX_MESSAGE_LENGTH} characters."
+
+
+# Agent runs in progress, keyed by _inflight_key(). Identical requests arriving
+# while one is running wait for its answer instead of calling the LLM again.
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+def _sse(payload: dict) -> str:
+    """Formats a payload as a Server-Sent Event."""
+    return f"data: {orjson.dumps(payload).decode()}\n\n"
+
+
+async def _stream_text(text: str):
+    """Streams an already complete response (e.g. a cache hit) as a single token."""
+    yield _sse({"token": text})
+
+
+def _reply(text: str, stream: bool):
+    """Returns a complete response in the format the client asked for."""
+    if stream:
+        return StreamingResponse(_stream_text(text), media_type="text/event-stream")
+    return {"response": text}
+
+
+def _fast_path_response(message: str):
+    """Returns a canned reply for messages that don't need the agent, otherwise None."""
+    stripped = message.strip()
+    if not stripped:
+        return EMPTY_MESSAGE_RESPONSE
+    if len(stripped) > MAX_MESSAGE_LENGTH:
+        return TOO_LONG_RESPONSE
+    if stripped.lower().rstrip("!.?") in GREETINGS_SET:
+        return GREETING_RESPONSE
+    return None
+
+
+def _inflight_key(request: ChatRequest) -> str:
+    raw = orjson.dumps([request.session_id, request.use_rag, request.system_prompt, request.message])
+    return hashlib.sha256(raw).hexdigest()
+
+
+def _start_inflight(key: str) -> asyncio.Future:
+    """Registers a new agent run that identical requests can wait on."""
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    return future
+
+
+def _finish_inflight(key: str, future: asyncio.Future, result: Optional[str]):
+    """
+    Hands the run's answer to every waiting duplicate and unregisters the run.
+    A missing result means the run failed (or was cancelled) and fails the waiters too.
+    """
+    if _inflight.get(key) is future:
+        del _inflight[key]
+    if future.done():
+        return
+    if result is None:
+        future.set_exception(RuntimeError("Agent run did not produce a response."))
+        future.exception()  # There may be no waiters; don't log it as never retrieved
+    else:
+        future.set_result(result)
+
+
+async def _stream_inflight(future: asyncio.Future):
+    """Streams the answer of an identical request that is already running."""
+    try:
+        # shield: a waiter disconnecting must not cancel the shared future
+        text = await asyncio.shield(future)
+    except Exception:
+        yield _sse({"error": ERROR_RESPONSE})
+        return
+    yield _sse({"token": text})
+
+
+async def _stream_agent(inputs: dict, config: dict, query_embedding, cache_namespace: str, session_id: str, inflight_key: str, future: asyncio.Future):
+    """
+    Runs the agent with astream_events and yields each LLM token as soon as it
+    is generated. When the answer comes from the LLM cache no tokens are
+    streamed, so the final message is sent in one piece instead.
+    Resolves the in-flight `future` that chat() registered for this run.
+    """
+    streamed = False
+    final_content = None
+    try:
+        try:
+            async for event in agent_executer.astream_events(inputs, config=config, version="v2"):
+                kind = event["event"]
+                if kind == "on_chat_model_stream" and event["metadata"].get("langgraph_node") in GENERATION_NODES:
+                    token = event["data"]["chunk"].content
+                    if token:
+                        streamed = True
+                        yield _sse({"token": token})
+                elif kind == "on_chain_end" and not event.get("parent_ids"):
+                    # The root run ending carries the final graph state
+                    final_content = event["data"]["output"]["messages"][-1].content
+        except Exception as e:
+            print(f"Error during agent execution: {e}")
+            yield _sse({"error": ERROR_RESPONSE})
+            return
+
+        if final_content is None:
+            return
+        _finish_inflight(inflight_key, future, final_content)
+        if not streamed:
+            yield _sse({"token": final_content})
+        await semantic_cache.set(query_embedding, cache_namespace, session_id, final_content)
+    finally:
+        _finish_inflight(inflight_key, future, final_content)
+
+
 @router.post("/chat")
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, stream: bool = True):
+    """
+    Runs the agent on the user's message.
+    By default the answer is streamed as Server-Sent Events (`data: {"token": ...}`);
+    pass `?stream=false` to get the complete answer as `{"response": ...}`.
+    """
+    # Empty messages, greetings and oversized inputs never reach the agent
+    fast_response = _fast_path_response(request.message)
+    if fast_response is not None:
+        return _reply(fast_response, stream)
+
     # Pass the use_rag flag into the agent's state
     config = {"configurable": {"session_id": request.session_id}}
     inputs = {
@@ -38,15 +177,51 @@ async def chat(request: ChatRequest):
         "session_id": request.session_id,
         "system_prompt": request.system_prompt # ADD the system prompt
     }
-    
+
+    # Answer semantically identical questions from the cache without running the agent
+    cache_namespace = semantic_cache.make_namespace(
+        request.session_id, request.use_rag, request.system_prompt
+    )
+    query_embedding = await semantic_cache.embed_query(request.message)
+    cached_response = await semantic_cache.get(query_embedding, cache_namespace)
+    if cached_response is not None:
+        return _reply(cached_response, stream)
+
+    # Coalesce with an identical request that is already running
+    inflight_key = _inflight_key(request)
+    inflight = _inflight.get(inflight_key)
+    if inflight is not None:
+        print("--- Waiting for identical in-flight request ---")
+        if stream:
+            return StreamingResponse(_stream_inflight(inflight), media_type="text/event-stream")
+        try:
+            return {"response": await asyncio.shield(inflight)}
+        except Exception:
+            return {"response": ERROR_RESPONSE}
+
+    # Registered before returning, so duplicates arriving before the stream starts also wait
+    future = _start_inflight(inflight_key)
+    if stream:
+        body = _stream_agent(
+            inputs, config, query_embedding, cache_namespace, request.session_id, inflight_key, future
+        )
+        # A client that disconnects before the first chunk means the generator never
+        # runs (nor its finally); the run is then resolved when the generator is dropped.
+        weakref.finalize(body, _finish_inflight, inflight_key, future, None)
+        return StreamingResponse(body, media_type="text/event-stream")
+
+    content = None
     try:
-        # We will use stream for better UX later, but for now invoke works
         response_state = await agent_executer.ainvoke(inputs, config=config)
-        last_message = response_state["messages"][-1]
-        return {"response": last_message.content}
+        content = response_state["messages"][-1].content
+        _finish_inflight(inflight_key, future, content)
+        await semantic_cache.set(
+            query_embedding, cache_namespace, request.session_id, content
+        )
+        return {"response": content}
         
     except Exception as e:
         print(f"Error during agent execution: {e}")
-        return {"response": "Sorry, an error occurred while processing your request."}
-
-
+        return {"response": ERROR_RESPONSE}
+    finally:
+        _finish_inflight(inflight_key, future, content)
@@ -1,6 +1,8 @@
+import asyncio
 import os
-import shutil
 import uuid
+
+import aiofiles
 from fastapi import (
     APIRouter,
     UploadFile,
@@ -10,7 +12,7 @@ from fastapi import (
     status,
 )
 
-from app.services import document_parser, vector_store
+from app.services import document_parser, semantic_cache, vector_store
 
 router = APIRouter()
 
@@ -18,6 +20,34 @@ router = APIRouter()
 UPLOAD_DIR = "temp_uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
+MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB in bytes
+UPLOAD_CHUNK_SIZE = 64 * 1024  # Bytes read from the request per iteration
+
+
+async def _save_upload(file: UploadFile, file_path: str):
+    """
+    Streams an uploaded file to disk chunk by chunk, so memory stays bounded
+    by UPLOAD_CHUNK_SIZE. Aborts as soon as the file exceeds MAX_FILE_SIZE;
+    the partially written file is removed by the caller's cleanup.
+    """
+    total_size = 0
+    async with aiofiles.open(file_path, "wb") as buffer:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            total_size += len(chunk)
+            if total_size > MAX_FILE_SIZE:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="File too large. Maximum size allowed is 50MB."
+                )
+            await buffer.write(chunk)
+
+
+def _parse_document(file_path: str, file_extension: str):
+    """PDFs are parsed across several processes; other formats in a single pass."""
+    if file_extension.lower() == ".pdf":
+        return document_parser.parse_pdf_parallel(file_path)
+    return document_parser.parse_file(file_path, file_extension)
+
 
 @router.post("/upload")
 async def upload_file(
@@ -42,32 +72,20 @@ async def upload_file(
             detail="No file name provided."
         )
     
-    # Check file size (limit to 50MB)
-    MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB in bytes
-    file_content = await file.read()
-    if len(file_content) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Maximum size allowed is 50MB. Your file is {len(file_content) / (1024*1024):.1f}MB."
-        )
-    
-    # Reset file pointer for later use
-    await file.seek(0)
-
     # Create a unique, secure filename to avoid collisions and path traversal
     file_extension = os.path.splitext(file.filename)[1]
     unique_filename = f"{uuid.uuid4()}{file_extension}"
     file_path = os.path.join(UPLOAD_DIR, unique_filename)
 
     try:
-        # Save the uploaded file to the temporary directory
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Stream the uploaded file to the temporary directory (limit to 50MB)
+        await _save_upload(file, file_path)
 
         # --- Core Logic: Parse and Embed ---
         print(f"Parsing file: {file.filename} ({file_path})")
         try:
-            document_chunks = document_parser.parse_file(file_path, file_extension)
+            # Parsing is CPU/disk bound, run it off the event loop
+            document_chunks = await asyncio.to_thread(_parse_document, file_path, file_extension)
         except Exception as e:
             print(f"Error parsing file {file.filename}: {e}")
             raise HTTPException(
@@ -85,13 +103,16 @@ async def upload_file(
         print(f"Adding chunks to vector store for session_id: {session_id}")
         
         try:
-            vector_store.add_documents_to_store(document_chunks, session_id)
+            await asyncio.to_thread(vector_store.add_documents_to_store, document_chunks, session_id)
         except Exception as e:
             print(f"Vector store error: {e}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to create embeddings for the document. {str(e)}"
             )
+
+        # Cached answers for this session may be outdated now that it has new documents
+        await semantic_cache.clear_session(session_id)
         
         # Here you could also link the document IDs/chunks to the session_id in Redis/Postgres
         # For now, we are adding to a global store for simplicity.
@@ -147,32 +168,20 @@ async def upload_user_details(
             detail="No file name provided."
         )
     
-    # Check file size (limit to 50MB)
-    MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB in bytes
-    file_content = await file.read()
-    if len(file_content) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"File too large. Maximum size allowed is 50MB. Your file is {len(file_content) / (1024*1024):.1f}MB."
-        )
-    
-    # Reset file pointer for later use
-    await file.seek(0)
-
     # Create a unique, secure filename to avoid collisions and path traversal
     file_extension = os.path.splitext(file.filename)[1]
     unique_filename = f"{uuid.uuid4()}{file_extension}"
     file_path = os.path.join(UPLOAD_DIR, unique_filename)
 
     try:
-        # Save the uploaded file to the temporary directory
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        # Stream the uploaded file to the temporary directory (limit to 50MB)
+        await _save_upload(file, file_path)
 
         # --- Core Logic: Parse and Embed ---
         print(f"Parsing user details file: {file.filename} ({file_path})")
         try:
-            document_chunks = document_parser.parse_file(file_path, file_extension)
+            # Parsing is CPU/disk bound, run it off the event loop
+            document_chunks = await asyncio.to_thread(_parse_document, file_path, file_extension)
         except Exception as e:
             print(f"Error parsing user details file {file.filename}: {e}")
             raise HTTPException(
@@ -191,13 +200,15 @@ async def upload_user_details(
         
         try:
             # Add user details to the same vector store but with special metadata
-            vector_store.add_documents_to_store(document_chunks, session_id)
+            await asyncio.to_thread(vector_store.add_documents_to_store, document_chunks, session_id)
         except Exception as e:
             print(f"Vector store error for user details: {e}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to create embeddings for the user details document. {str(e)}"
             )
+
+        await semantic_cache.clear_session(session_id)
         
         return {
             "status": "success",
@@ -1,3 +1,5 @@
+from typing import Optional
+
 try:
     from pydantic_settings import BaseSettings, SettingsConfigDict
     HAS_PYDANTIC_SETTINGS = True
@@ -12,7 +14,12 @@ class Settings(BaseSettings):
     # OPENAI_API_KEY: str
     # ANTHROPIC_API_KEY: str
     GOOGLE_API_KEY: str
+    GEMINI_MODEL: str = "gemini-1.5-pro"
+    TAVILY_API_KEY: Optional[str] = None
     REDIS_URL: str = "redis://localhost:6379"
+    VECTOR_BACKEND: str = "chroma"  # "chroma" or "faiss"
+    FAISS_QUANTIZATION: str = "int8"  # "none", "int8" or "binary", applies to new FAISS shards
+    PDF_PARALLEL_MIN_PAGES: int = 1000  # PDFs with fewer pages are parsed in a single process
     
     if HAS_PYDANTIC_SETTINGS:
         model_config = SettingsConfigDict(
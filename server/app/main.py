@@ -1,13 +1,19 @@
 # In: apps/backend/app/main.py
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.v1.endpoints import chat, upload , live_chat 
+from app.agent.nodes import warmup_llm
+from app.services import embed_batcher
+from app.tools import web_search
 
 # Create the FastAPI app instance
 app = FastAPI(
     title="Intelligent Chatbot API",
     version="1.0.0",
+    # orjson encodes responses several times faster than the stdlib json module
+    default_response_class=ORJSONResponse,
 )
 
 # --- ADD THIS CORS MIDDLEWARE SECTION ---
@@ -28,6 +34,18 @@ app.add_middleware(
 )
 # -----------------------------------------
 
+@app.on_event("startup")
+async def warmup():
+    # Start coalescing query embeddings across concurrent requests
+    embed_batcher.start()
+    # Open the Gemini connection before the first user request needs it
+    await warmup_llm()
+
+@app.on_event("shutdown")
+async def shutdown():
+    await embed_batcher.stop()
+    await web_search.close_async_client()
+
 # Include your API routers
 app.include_router(chat.router, prefix="/api/v1", tags=["Chat"])
 app.include_router(upload.router, prefix="/api/v1", tags=["File Upload"])
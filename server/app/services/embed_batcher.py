@@ -0,0 +1,97 @@
+# apps/backend/app/services/embed_batcher.py
+import asyncio
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+from app.services import vector_store
+
+# --- Configuration ---
+BATCH_WINDOW_SECONDS = 0.01  # How long to wait for more queries before embedding
+MAX_BATCH_SIZE = 32
+RECENT_CACHE_SIZE = 256  # Recently embedded queries kept to avoid re-embedding
+
+# --- State ---
+_queue: Optional[asyncio.Queue] = None
+_worker: Optional[asyncio.Task] = None
+_recent: "OrderedDict[str, List[float]]" = OrderedDict()
+
+
+def start():
+    """
+    Starts the background task that drains the queue. Called on app startup,
+    and lazily by embed() so the batcher also works outside of FastAPI.
+    """
+    global _queue, _worker
+    if _worker is not None and not _worker.done():
+        return
+    _queue = asyncio.Queue()
+    _worker = asyncio.create_task(_run())
+    print("Embedding batcher started.")
+
+
+async def stop():
+    """Stops the background task and fails any query still waiting."""
+    global _worker
+    if _worker is None:
+        return
+    _worker.cancel()
+    try:
+        await _worker
+    except asyncio.CancelledError:
+        pass
+    _worker = None
+
+    while _queue is not None and not _queue.empty():
+        _, future = _queue.get_nowait()
+        if not future.done():
+            future.set_exception(RuntimeError("Embedding batcher stopped."))
+
+
+async def embed(text: str) -> List[float]:
+    """
+    Returns the embedding of `text`. Queries arriving within the same
+    BATCH_WINDOW_SECONDS are embedded together in one request.
+    """
+    if text in _recent:
+        _recent.move_to_end(text)
+        return _recent[text]
+
+    start()
+    future = asyncio.get_running_loop().create_future()
+    await _queue.put((text, future))
+    return await future
+
+
+def _remember(text: str, embedding: List[float]):
+    _recent[text] = embedding
+    _recent.move_to_end(text)
+    if len(_recent) > RECENT_CACHE_SIZE:
+        _recent.popitem(last=False)
+
+
+async def _run():
+    while True:
+        batch: List[Tuple[str, asyncio.Future]] = [await _queue.get()]
+        # Give concurrent requests a moment to join this batch
+        await asyncio.sleep(BATCH_WINDOW_SECONDS)
+        while not _queue.empty() and len(batch) < MAX_BATCH_SIZE:
+            batch.append(_queue.get_nowait())
+
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            embeddings = await asyncio.to_thread(
+                vector_store.embedding_function.embed_documents, texts, batch_size=MAX_BATCH_SIZE
+            )
+        except Exception as e:
+            print(f"Error embedding batch of {len(texts)} queries: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            continue
+
+        embeddings_by_text = dict(zip(texts, embeddings))
+        for text, embedding in embeddings_by_text.items():
+            _remember(text, embedding)
+        for text, future in batch:
+            if not future.done():
+                future.set_result(embeddings_by_text[text])
@@ -0,0 +1,66 @@
+# apps/backend/app/services/llm_cache.py
+import hashlib
+import json
+from typing import Any, List, Optional
+
+from app.services import redis_client
+
+# --- Configuration ---
+KEY_PREFIX = "llm_cache:"
+DEFAULT_TTL_SECONDS = 60 * 60
+
+
+def _serialize_message(message: Any) -> List[str]:
+    """Turns a LangChain message or a (role, content) tuple into [role, content]."""
+    if isinstance(message, tuple):
+        role, content = message
+        return [role, content]
+    return [message.type, message.content]
+
+
+def make_key(
+    model: str,
+    messages: List[Any],
+    temperature: float,
+    system_prompt: str,
+    context: str = "",
+) -> Optional[str]:
+    """
+    Builds the cache key for an LLM call.
+    Returns None for non-deterministic calls (temperature > 0), which must not be cached.
+    """
+    if temperature and temperature > 0:
+        return None
+
+    payload = json.dumps(
+        {
+            "model": model,
+            "messages": [_serialize_message(m) for m in messages],
+            "temperature": temperature,
+            "system_prompt": system_prompt,
+            "context": context,
+        },
+        sort_keys=True,
+    )
+    return KEY_PREFIX + hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def get(key: Optional[str]) -> Optional[str]:
+    """Returns the cached LLM response for the key, if any."""
+    if key is None or not redis_client.available():
+        return None
+    try:
+        return await redis_client.client.get(key)
+    except Exception as e:
+        redis_client.report_error("LLM cache lookup", e)
+        return None
+
+
+async def set(key: Optional[str], value: str, ttl: int = DEFAULT_TTL_SECONDS):
+    """Stores an LLM response under the key with a TTL."""
+    if key is None or not redis_client.available():
+        return
+    try:
+        await redis_client.client.set(key, value, ex=ttl)
+    except Exception as e:
+        redis_client.report_error("LLM cache store", e)
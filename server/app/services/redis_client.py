@@ -0,0 +1,49 @@
+# apps/backend/app/services/redis_client.py
+import time
+from typing import Optional
+
+import redis.asyncio as redis
+
+from app.core.config import settings
+
+# --- Configuration ---
+# Caching is optional, so an unreachable Redis must fail fast rather than
+# holding every chat request until the OS gives up on the TCP connection.
+SOCKET_CONNECT_TIMEOUT_SECONDS = 0.5
+SOCKET_TIMEOUT_SECONDS = 1.0
+RETRY_AFTER_SECONDS = 30  # How long Redis is skipped after a connection failure
+
+
+def _create_client() -> Optional[redis.Redis]:
+    """Returns the shared client, or None if REDIS_URL is invalid (caching is then disabled)."""
+    try:
+        return redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=True,
+            socket_connect_timeout=SOCKET_CONNECT_TIMEOUT_SECONDS,
+            socket_timeout=SOCKET_TIMEOUT_SECONDS,
+        )
+    except ValueError as e:
+        print(f"Redis caching disabled, REDIS_URL {settings.REDIS_URL!r} is invalid: {e}")
+        return None
+
+
+# --- Initialization ---
+# Shared by the cache modules, so they use one connection pool
+client = _create_client()
+_retry_at = 0.0  # time.monotonic() before which Redis is considered down
+
+
+def available() -> bool:
+    """False if caching is disabled or Redis failed to connect less than RETRY_AFTER_SECONDS ago."""
+    return client is not None and time.monotonic() >= _retry_at
+
+
+def report_error(action: str, error: Exception):
+    """Logs a failed Redis call. Connection failures also pause Redis use for RETRY_AFTER_SECONDS."""
+    global _retry_at
+    if isinstance(error, (redis.ConnectionError, redis.TimeoutError)):
+        _retry_at = time.monotonic() + RETRY_AFTER_SECONDS
+        print(f"{action} failed, skipping Redis for {RETRY_AFTER_SECONDS}s: {error}")
+    else:
+        print(f"{action} failed: {error}")
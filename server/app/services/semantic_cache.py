@@ -0,0 +1,166 @@
+# apps/backend/app/services/semantic_cache.py
+import asyncio
+import hashlib
+import uuid
+from typing import List, Optional
+
+import numpy as np
+import redis.asyncio as redis
+from redis.commands.search.field import TagField, TextField, VectorField
+from redis.commands.search.query import Query
+
+try:
+    from redis.commands.search.index_definition import IndexDefinition, IndexType
+except ImportError:  # redis-py < 6 names the module indexDefinition
+    from redis.commands.search.indexDefinition import IndexDefinition, IndexType
+
+from app.services import embed_batcher
+from app.services.redis_client import client as redis_client
+
+# --- Configuration ---
+INDEX_NAME = "semantic_cache_idx"
+KEY_PREFIX = "semantic_cache:"
+SIMILARITY_THRESHOLD = 0.95  # Cosine similarity required for a cache hit
+CACHE_TTL_SECONDS = 60 * 60  # Cached answers expire after 1 hour
+
+# --- Initialization ---
+# The index is created lazily because its dimension depends on the embedding model.
+# `None` means "not checked yet", `False` means Redis or RediSearch is unavailable.
+_index_ready: Optional[bool] = None if redis_client is not None else False
+_index_lock = asyncio.Lock()
+
+
+def make_namespace(session_id: str, use_rag: bool, system_prompt: str) -> str:
+    """
+    Builds the cache namespace so different sessions, RAG modes and
+    system prompts never share cached answers.
+    """
+    prompt_hash = hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+    raw = f"{session_id}|{int(use_rag)}|{prompt_hash}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _session_key_prefix(session_id: str) -> str:
+    # Hash the session id so it can't inject SCAN glob characters or prefix another session
+    session_hash = hashlib.sha256(session_id.encode("utf-8")).hexdigest()
+    return f"{KEY_PREFIX}{session_hash}:"
+
+
+async def embed_query(query: str) -> Optional[List[float]]:
+    """
+    Embeds the query with the same model the vector store already loaded,
+    through the shared embedding batcher.
+    Returns None if the embedding could not be created, or without embedding
+    at all once the cache is known to be disabled.
+    """
+    if _index_ready is False:
+        return None
+    try:
+        return await embed_batcher.embed(query)
+    except Exception as e:
+        print(f"Semantic cache: could not embed query: {e}")
+        return None
+
+
+async def _ensure_index(dim: int) -> bool:
+    """Creates the RediSearch HNSW index on first use."""
+    global _index_ready
+    if _index_ready is not None:
+        return _index_ready
+
+    async with _index_lock:
+        if _index_ready is not None:
+            return _index_ready
+        try:
+            try:
+                await redis_client.ft(INDEX_NAME).info()
+            except redis.ResponseError:
+                await redis_client.ft(INDEX_NAME).create_index(
+                    fields=[
+                        TagField("namespace"),
+                        TextField("response", no_stem=True),
+                        VectorField(
+                            "embedding",
+                            "HNSW",
+                            {"TYPE": "FLOAT32", "DIM": dim, "DISTANCE_METRIC": "COSINE"},
+                        ),
+                    ],
+                    definition=IndexDefinition(prefix=[KEY_PREFIX], index_type=IndexType.HASH),
+                )
+                print(f"Created semantic cache index '{INDEX_NAME}' (dim={dim}).")
+            _index_ready = True
+        except Exception as e:
+            print(f"Semantic cache disabled, Redis or RediSearch is not available: {e}")
+            _index_ready = False
+    return _index_ready
+
+
+async def get(embedding: Optional[List[float]], namespace: str) -> Optional[str]:
+    """
+    Returns the cached response of the most similar previous query in the
+    namespace, or None if nothing is similar enough.
+    """
+    if embedding is None or not await _ensure_index(len(embedding)):
+        return None
+
+    query = (
+        Query(f"(@namespace:{{{namespace}}})=>[KNN 1 @embedding $vec AS score]")
+        .sort_by("score")
+        .return_fields("response", "score")
+        .dialect(2)
+    )
+    try:
+        results = await redis_client.ft(INDEX_NAME).search(
+            query,
+            query_params={"vec": np.asarray(embedding, dtype=np.float32).tobytes()},
+        )
+    except Exception as e:
+        print(f"Semantic cache lookup failed: {e}")
+        return None
+
+    if not results.docs:
+        return None
+
+    # RediSearch reports cosine *distance*, i.e. 1 - similarity
+    best = results.docs[0]
+    similarity = 1 - float(best.score)
+    if similarity < SIMILARITY_THRESHOLD:
+        return None
+
+    print(f"--- SEMANTIC CACHE HIT (similarity={similarity:.3f}) ---")
+    return best.response
+
+
+async def set(embedding: Optional[List[float]], namespace: str, session_id: str, response: str):
+    """Stores a response under the query embedding with a TTL."""
+    if embedding is None or not await _ensure_index(len(embedding)):
+        return
+
+    key = f"{_session_key_prefix(session_id)}{uuid.uuid4().hex}"
+    try:
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={
+                "namespace": namespace,
+                "response": response,
+                "embedding": np.asarray(embedding, dtype=np.float32).tobytes(),
+            })
+            pipe.expire(key, CACHE_TTL_SECONDS)
+            await pipe.execute()
+    except Exception as e:
+        print(f"Semantic cache store failed: {e}")
+
+
+async def clear_session(session_id: str):
+    """
+    Drops every cached answer of a session. Called after new documents are
+    uploaded, since earlier RAG answers may no longer be accurate.
+    """
+    if redis_client is None:
+        return
+    try:
+        keys = [key async for key in redis_client.scan_iter(match=f"{_session_key_prefix(session_id)}*")]
+        if keys:
+            await redis_client.delete(*keys)
+            print(f"Cleared {len(keys)} cached answers for session_id: {session_id}")
+    except Exception as e:
+        print(f"Semantic cache clear failed: {e}")
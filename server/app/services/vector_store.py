@@ -36,6 +36,9 @@ from typing import List
 from app.core.config import settings
 from google import genai
 import os 
+import threading
+import uuid
+from cachetools import TTLCache
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -51,6 +54,13 @@ client = genai.Client(api_key=GOOGLE_API_KEY)
 CHROMA_PERSIST_DIRECTORY = "chroma_db"
 CHROMA_COLLECTION_NAME = "multimodal_rag_collection"
 
+# Number of chunks embedded and written to ChromaDB per collection.add() call
+BATCH_SIZE = 100
+
+# Retrievers are reused per session; inactive sessions are evicted after 30 minutes
+RETRIEVER_CACHE_SIZE = 1024
+RETRIEVER_CACHE_TTL_SECONDS = 30 * 60
+
 # --- Initialization ---
 # Initialize the Google Generative AI embedding model
 # We use LangChain's wrapper for seamless integration.
@@ -69,14 +79,22 @@ vector_store = Chroma(
     embedding_function=embedding_function,
 )
 
+_retriever_cache = TTLCache(maxsize=RETRIEVER_CACHE_SIZE, ttl=RETRIEVER_CACHE_TTL_SECONDS)
+_retriever_cache_lock = threading.Lock()
+
 # --- Service Functions ---
-def add_documents_to_store(documents: List[Document],session_id: str):
+def add_documents_to_store(documents: List[Document],session_id: str, batch_size: int = BATCH_SIZE):
     """
     Adds a list of LangChain documents to the persistent Chroma vector store.
-    The documents will be embedded using the GoogleGenerativeAIEmbeddings function.
+    The documents are embedded with the GoogleGenerativeAIEmbeddings function
+    and written in batches of `batch_size`, one collection.add() per batch.
     """
     if not documents:
         return
+
+    if settings.VECTOR_BACKEND == "faiss":
+        from app.services import vector_store_faiss
+        return vector_store_faiss.add_documents_to_store(documents, session_id, batch_size)
     
     try:
         # --- CORE CHANGE: Add metadata to each document chunk ---
@@ -86,7 +104,19 @@ def add_documents_to_store(documents: List[Document],session_id: str):
 
         print(f"Adding {len(documents)} document chunks with session_id '{session_id}' to ChromaDB.")
         print("Creating embeddings with Google API...")
-        vector_store.add_documents(documents)
+        collection = vector_store._collection
+        for start in range(0, len(documents), batch_size):
+            batch = documents[start:start + batch_size]
+            texts = [doc.page_content for doc in batch]
+            # Embed outside Chroma so the whole batch goes out in one embedding request
+            embeddings = embedding_function.embed_documents(texts, batch_size=batch_size)
+            collection.add(
+                ids=[str(uuid.uuid4()) for _ in batch],
+                documents=texts,
+                metadatas=[doc.metadata for doc in batch],
+                embeddings=embeddings,
+            )
+            print(f"Added chunks {start + 1}-{start + len(batch)} of {len(documents)}.")
         print("Successfully added documents to the store.")
         
     except Exception as e:
@@ -104,12 +134,53 @@ def get_retriever(session_id: str, search_kwargs={"k": 3}):
     """
     Returns a retriever for the Chroma vector store that is filtered
     to only search documents matching the given session_id.
+    Retrievers are cached per (session_id, k) so repeated requests reuse them.
+    """
+    if settings.VECTOR_BACKEND == "faiss":
+        from app.services import vector_store_faiss
+        return vector_store_faiss.get_retriever(session_id, search_kwargs)
+
+    k = search_kwargs.get("k", 3)
+    cache_key = (session_id, k)
+
+    # TTLCache is not thread-safe and this is called from worker threads
+    with _retriever_cache_lock:
+        retriever = _retriever_cache.get(cache_key)
+        if retriever is None:
+            print(f"Creating retriever for session_id: {session_id}")
+            # --- CORE CHANGE: Use the 'filter' argument in as_retriever ---
+            retriever = vector_store.as_retriever(
+                search_kwargs={
+                    "k": k,
+                    "filter": {"session_id": session_id}
+                }
+            )
+            _retriever_cache[cache_key] = retriever
+    return retriever
+
+
+def get_collection(session_id: str):
+    """
+    Returns the raw ChromaDB collection holding the session's chunks.
+    All sessions share one collection, so queries must filter on session_id.
+    """
+    return vector_store._collection
+
+
+def search_by_vector(embedding: List[float], session_id: str, k: int = 3) -> List[str]:
+    """
+    Returns the contents of the `k` chunks of a session closest to an
+    already computed query embedding. Queries ChromaDB directly, skipping the
+    retriever's own embedding call and the LangChain Document wrappers.
     """
-    print(f"Creating retriever for session_id: {session_id}")
-    # --- CORE CHANGE: Use the 'filter' argument in as_retriever ---
-    return vector_store.as_retriever(
-        search_kwargs={
-            "k": search_kwargs.get("k", 3),
-            "filter": {"session_id": session_id}
-        }
-    )
\ No newline at end of file
+    if settings.VECTOR_BACKEND == "faiss":
+        from app.services import vector_store_faiss
+        return vector_store_faiss.search_by_vector(embedding, session_id, k)
+
+    results = get_collection(session_id).query(
+        query_embeddings=[embedding],
+        n_results=k,
+        where={"session_id": session_id},
+        include=["documents"],
+    )
+    return results["documents"][0] if results["documents"] else []
@@ -0,0 +1,247 @@
+# apps/backend/app/services/vector_store_faiss.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from contextlib import closing
+from typing import List
+
+import faiss
+import numpy as np
+from cachetools import TTLCache
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+from app.core.config import settings
+from app.services.vector_store import BATCH_SIZE, embedding_function
+
+# --- Configuration ---
+# Every session is a separate shard: a .faiss index plus a sqlite sidecar
+# mapping the vector ids to the chunk text, metadata and FP32 embedding.
+# The index itself may hold quantized vectors (settings.FAISS_QUANTIZATION):
+#   "none"   - FP32, exact inner product
+#   "int8"   - 8-bit scalar quantization, 4x smaller
+#   "binary" - 1 bit per dimension with Hamming distance, 32x smaller
+# Quantized searches fetch RERANK_CANDIDATES hits and re-rank them by FP32 cosine.
+FAISS_PERSIST_DIRECTORY = "faiss_db"
+HNSW_M = 32  # Neighbours per HNSW node
+HNSW_EF_SEARCH = 64  # Candidates explored per query
+RERANK_CANDIDATES = 50
+# HNSW indexes are read fully into memory, so only recently searched shards are kept
+INDEX_CACHE_SIZE = 64
+INDEX_CACHE_TTL_SECONDS = 30 * 60
+
+os.makedirs(FAISS_PERSIST_DIRECTORY, exist_ok=True)
+
+# --- State ---
+_index_cache = TTLCache(maxsize=INDEX_CACHE_SIZE, ttl=INDEX_CACHE_TTL_SECONDS)
+_lock = threading.Lock()  # Guards _index_cache, which is not thread-safe
+_write_lock = threading.Lock()  # Serializes writes to the shards
+
+
+def _shard_paths(session_id: str):
+    # Hash the session id so it is always a safe file name
+    shard = hashlib.sha256(session_id.encode("utf-8")).hexdigest()
+    base = os.path.join(FAISS_PERSIST_DIRECTORY, shard)
+    return f"{base}.faiss", f"{base}.sqlite"
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS chunks (id INTEGER PRIMARY KEY, content TEXT, metadata TEXT, embedding BLOB)"
+    )
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+    # Shards created before quantization support have no embedding column
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(chunks)")}
+    if "embedding" not in columns:
+        conn.execute("ALTER TABLE chunks ADD COLUMN embedding BLOB")
+    return conn
+
+
+def _shard_quantization(conn: sqlite3.Connection, index_path: str) -> str:
+    """Returns the quantization a shard was created with; new shards use the current setting."""
+    row = conn.execute("SELECT value FROM meta WHERE key = 'quantization'").fetchone()
+    if row:
+        return row[0]
+    # Shards written before quantization support have an index but no record, and are FP32
+    return "none" if os.path.exists(index_path) else settings.FAISS_QUANTIZATION
+
+
+def _normalize(embeddings) -> np.ndarray:
+    # Inner product on unit vectors is cosine similarity
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def _new_index(dim: int, quantization: str):
+    if quantization == "binary":
+        return faiss.IndexBinaryHNSW(dim, HNSW_M)
+    if quantization == "int8":
+        index = faiss.IndexHNSWSQ(dim, faiss.ScalarQuantizer.QT_8bit, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+        # Every component of a unit vector lies in [-1, 1], so the 8-bit codes use that
+        # fixed range instead of one learned from whichever batch arrives first
+        unit_range = np.array([[-1.0] * dim, [1.0] * dim], dtype=np.float32)
+        index.train(unit_range)
+        return index
+    return faiss.IndexHNSWFlat(dim, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+
+
+def _encode(vectors: np.ndarray, quantization: str) -> np.ndarray:
+    """Converts normalized FP32 vectors into what the shard's index stores."""
+    if quantization == "binary":
+        return np.packbits(vectors > 0, axis=1)
+    return vectors
+
+
+def _read_index(index_path: str, quantization: str):
+    if quantization == "binary":
+        return faiss.read_index_binary(index_path)
+    return faiss.read_index(index_path)
+
+
+def _write_index(index, index_path: str, quantization: str):
+    # Searches read the shard without _write_lock, so it is replaced atomically
+    # rather than overwritten in place
+    tmp_path = f"{index_path}.tmp"
+    if quantization == "binary":
+        faiss.write_index_binary(index, tmp_path)
+    else:
+        faiss.write_index(index, tmp_path)
+    os.replace(tmp_path, index_path)
+
+
+def _load_index(session_id: str, quantization: str):
+    """Returns the session's index for searching, or None if it has no documents."""
+    with _lock:
+        index = _index_cache.get(session_id)
+        if index is None:
+            index_path, _ = _shard_paths(session_id)
+            if not os.path.exists(index_path):
+                return None
+            index = _read_index(index_path, quantization)
+            index.hnsw.efSearch = max(HNSW_EF_SEARCH, RERANK_CANDIDATES)
+            _index_cache[session_id] = index
+        return index
+
+
+# --- Service Functions ---
+def add_documents_to_store(documents: List[Document], session_id: str, batch_size: int = BATCH_SIZE):
+    """
+    Adds a list of LangChain documents to the session's FAISS shard.
+    Chunks are embedded in batches of `batch_size` with the same
+    GoogleGenerativeAIEmbeddings function as the Chroma store.
+    """
+    if not documents:
+        return
+
+    index_path, db_path = _shard_paths(session_id)
+    try:
+        for doc in documents:
+            doc.metadata = {"session_id": session_id, **doc.metadata}
+
+        print(f"Adding {len(documents)} document chunks with session_id '{session_id}' to FAISS.")
+        print("Creating embeddings with Google API...")
+        with _write_lock, closing(_connect(db_path)) as conn:
+            quantization = _shard_quantization(conn, index_path)
+            index = _read_index(index_path, quantization) if os.path.exists(index_path) else None
+            for start in range(0, len(documents), batch_size):
+                batch = documents[start:start + batch_size]
+                texts = [doc.page_content for doc in batch]
+                vectors = _normalize(embedding_function.embed_documents(texts, batch_size=batch_size))
+
+                if index is None:
+                    index = _new_index(vectors.shape[1], quantization)
+                # HNSW assigns sequential ids, so the sidecar rows use the same ones
+                first_id = index.ntotal
+                index.add(_encode(vectors, quantization))
+                conn.executemany(
+                    "INSERT INTO chunks (id, content, metadata, embedding) VALUES (?, ?, ?, ?)",
+                    [
+                        (first_id + i, doc.page_content, json.dumps(doc.metadata, default=str), vectors[i].tobytes())
+                        for i, doc in enumerate(batch)
+                    ],
+                )
+                print(f"Added chunks {start + 1}-{start + len(batch)} of {len(documents)}.")
+
+            _write_index(index, index_path, quantization)
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('quantization', ?)", (quantization,)
+            )
+            conn.commit()
+            # Searches will re-open the updated shard
+            with _lock:
+                _index_cache.pop(session_id, None)
+        print("Successfully added documents to the store.")
+
+    except Exception as e:
+        print(f"Error creating embeddings or adding to FAISS store: {e}")
+        if "google" in str(e).lower() or "api_key" in str(e).lower():
+            raise Exception(f"Google API Error: {str(e)}. Please check your Google API key configuration.")
+        elif "timeout" in str(e).lower():
+            raise Exception("Embedding process timed out. The file might be too large or complex.")
+        else:
+            raise Exception(f"Vector store error: {str(e)}")
+
+
+def _search(embedding: List[float], session_id: str, k: int) -> List[Document]:
+    index_path, db_path = _shard_paths(session_id)
+    if not os.path.exists(index_path):
+        return []
+
+    with closing(_connect(db_path)) as conn:
+        quantization = _shard_quantization(conn, index_path)
+        index = _load_index(session_id, quantization)
+        if index is None or index.ntotal == 0:
+            return []
+
+        # Quantized indexes only shortlist candidates; FP32 re-ranking picks the final k
+        query = _normalize([embedding])
+        n_candidates = k if quantization == "none" else max(k, RERANK_CANDIDATES)
+        _, ids = index.search(_encode(query, quantization), n_candidates)
+        hits = [int(i) for i in ids[0] if i != -1]
+        if not hits:
+            return []
+
+        placeholders = ",".join("?" * len(hits))
+        rows = conn.execute(
+            f"SELECT id, content, metadata, embedding FROM chunks WHERE id IN ({placeholders})", hits
+        ).fetchall()
+    by_id = {row[0]: row for row in rows}
+    # Keep FAISS's ranking order
+    hits = [i for i in hits if i in by_id]
+
+    if quantization != "none" and all(by_id[i][3] is not None for i in hits):
+        candidates = np.stack([np.frombuffer(by_id[i][3], dtype=np.float32) for i in hits])
+        scores = candidates @ query[0]
+        hits = [hits[j] for j in np.argsort(-scores)]
+
+    return [
+        Document(page_content=by_id[i][1], metadata=json.loads(by_id[i][2]))
+        for i in hits[:k]
+    ]
+
+
+def search_by_vector(embedding: List[float], session_id: str, k: int = 3) -> List[str]:
+    """Returns the contents of the `k` chunks of a session closest to the query embedding."""
+    return [doc.page_content for doc in _search(embedding, session_id, k)]
+
+
+class FaissSessionRetriever(BaseRetriever):
+    """LangChain retriever over a single session's FAISS shard."""
+
+    session_id: str
+    k: int = 3
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        return _search(embedding_function.embed_query(query), self.session_id, self.k)
+
+
+def get_retriever(session_id: str, search_kwargs={"k": 3}):
+    """Returns a retriever that only searches the given session's shard."""
+    return FaissSessionRetriever(session_id=session_id, k=search_kwargs.get("k", 3))
@@ -1,13 +1,13 @@
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from typing import Optional
+import httpx
+from app.core.config import settings
 # from langchain_community.tools.tavily_search import TavilySearchResults
 from langchain_community.tools import TavilySearchResults
 
 
-# Only set the environment variable if the API key exists
-tavily_api_key = os.getenv("TAVILY_API_KEY")
+# TavilySearchResults reads the key from the environment, so export it if it is set
+tavily_api_key = settings.TAVILY_API_KEY
 if tavily_api_key:
     os.environ["TAVILY_API_KEY"] = tavily_api_key
 
@@ -28,4 +28,60 @@ def get_web_search_tool():
             # search_depth="advanced",
             # include_domains = []
             # exclude_domains = []
-        )
\ No newline at end of file
+        )
+
+
+TAVILY_SEARCH_URL = "https://api.tavily.com/search"
+
+# One pooled client for all async searches, created on first use
+_async_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    global _async_client
+    if _async_client is None:
+        _async_client = httpx.AsyncClient(timeout=10.0)
+    return _async_client
+
+
+async def close_async_client():
+    """Closes the pooled HTTP client; called on app shutdown."""
+    global _async_client
+    if _async_client is not None:
+        await _async_client.aclose()
+        _async_client = None
+
+
+def get_async_web_search_tool():
+    """
+    Async counterpart of get_web_search_tool() that calls Tavily's REST API
+    directly, so a search does not block the event loop.
+    Returns a coroutine function `search(query)` or None if no API key is set.
+    """
+    if not tavily_api_key:
+        print("Warning: TAVILY_API_KEY not found. Web search tool will not be available.")
+        return None
+
+    async def search(query: str):
+        response = await _get_async_client().post(
+            TAVILY_SEARCH_URL,
+            json={
+                "api_key": tavily_api_key,
+                "query": query,
+                "max_results": 5,
+                "include_answer": True,
+            },
+        )
+        response.raise_for_status()
+        data = response.json()
+
+        # Same shape as TavilySearchResults: a list of {url, content} dicts
+        results = [
+            {"url": result.get("url", ""), "content": result.get("content", "")}
+            for result in data.get("results", [])
+        ]
+        if data.get("answer"):
+            results.insert(0, {"url": "", "content": data["answer"]})
+        return results
+
+    return search
@@ -1,10 +1,28 @@
+import asyncio
+
+import httpx
 from langchain_openai import ChatOpenAI
 
-llm = ChatOpenAI(
-    base_url="http://localhost:12434/engines/v1",
-    api_key="docker",
-    model="ai/llama3.2"
-)
 
-response = llm.invoke("Tell me about india??")
-print(response.content)
\ No newline at end of file
+async def main():
+    # The model runs on localhost, so plain HTTP/1.1 with keepalive is enough;
+    # one client is reused for every request instead of reconnecting each time.
+    async with httpx.AsyncClient(limits=httpx.Limits(max_keepalive_connections=8)) as http_client:
+        llm = ChatOpenAI(
+            base_url="http://localhost:12434/engines/v1",
+            api_key="docker",
+            model="ai/llama3.2",
+            http_async_client=http_client,
+        )
+
+        response = await llm.ainvoke("Tell me about india??")
+        print(response.content)
+
+        # Several prompts at once keep the local model's batch scheduler busy
+        prompts = ["Tell me about india??", "Tell me about japan??", "Tell me about brazil??"]
+        responses = await asyncio.gather(*[llm.ainvoke(prompt) for prompt in prompts])
+        for response in responses:
+            print(response.content)
+
+
+asyncio.run(main())